@@ -1,9 +1,11 @@
 # scanner.py — resilient analysis & earnings cache
-import os, json, math, time, datetime as dt, logging
+import os, math, time, threading, datetime as dt, logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
+import orjson
 import pandas as pd
 import yfinance as yf
 from ta.momentum import RSIIndicator
@@ -25,14 +27,25 @@ def chunk(items, size):
         yield items[i:i+size]
 
 # ---------- Universe ----------
+# (mtime, symbols) of the last universe.csv parse; re-read only when the file changes
+_universe_mem: Optional[Tuple[float, Tuple[str, ...]]] = None
+
 def ensure_universe() -> List[str]:
+    global _universe_mem
     # Load cached list first
-    if os.path.exists(UNIVERSE_CACHE):
+    try:
+        mtime = os.path.getmtime(UNIVERSE_CACHE)
+    except OSError:
+        mtime = None
+    if mtime is not None:
+        if _universe_mem and _universe_mem[0] == mtime:
+            return list(_universe_mem[1])
         try:
             df = pd.read_csv(UNIVERSE_CACHE)
             syms = [s for s in df["symbol"].astype(str).str.upper().tolist() if s.isalnum()]
             if syms:
-                return sorted(set(syms))
+                _universe_mem = (mtime, tuple(sorted(set(syms))))
+                return list(_universe_mem[1])
         except Exception:
             pass
 
@@ -80,30 +93,68 @@ def _pct(a: Optional[float], b: Optional[float]) -> Optional[float]:
     except Exception:
         return None
 
+def _ohlcv(df) -> pd.DataFrame:
+    """Normalize a single-symbol frame to OHLCV columns; empty frame if unusable."""
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return pd.DataFrame()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [lvl0 for (lvl0, _) in df.columns]
+    # guarantee the columns we use exist
+    need = ["Open","High","Low","Close"]
+    if not all(c in df.columns for c in need):
+        return pd.DataFrame()
+    if "Volume" not in df.columns:
+        df["Volume"] = np.nan
+    return df[["Open","High","Low","Close","Volume"]].dropna(how="all")
+
 def _history(symbol: str) -> pd.DataFrame:
     """Robust history loader with fallbacks and normalization."""
     combos = [("6mo","1d"), ("3mo","1d"), ("60d","1h"), ("30d","30m"), ("15d","15m")]
     for period, interval in combos:
         try:
-            df = yf.download(symbol, period=period, interval=interval,
-                             auto_adjust=False, progress=False, threads=False)
-            if not isinstance(df, pd.DataFrame) or df.empty:
-                continue
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = [lvl0 for (lvl0, _) in df.columns]
-            # guarantee the columns we use exist
-            need = ["Open","High","Low","Close"]
-            if not all(c in df.columns for c in need):
-                continue
-            if "Volume" not in df.columns:
-                df["Volume"] = np.nan
-            out = df[["Open","High","Low","Close","Volume"]].dropna(how="all")
+            out = _ohlcv(yf.download(symbol, period=period, interval=interval,
+                                     auto_adjust=False, progress=False, threads=False))
             if not out.empty:
                 return out
         except Exception:
             continue
     return pd.DataFrame()
 
+HISTORY_BATCH = 20  # symbols per yf.download call
+
+def _batch_history(symbols: Sequence[str], period: str = "6mo", interval: str = "1d") -> Dict[str, pd.DataFrame]:
+    """
+    Multi-symbol history in HISTORY_BATCH-sized yf.download calls, sliced per symbol.
+    Symbols Yahoo returned nothing for are left out.
+    """
+    out: Dict[str, pd.DataFrame] = {}
+    for batch in chunk(list(symbols), HISTORY_BATCH):
+        # a failed or rate-limited batch only loses its own symbols (they fall back later)
+        out.update(_download_batch(batch, period, interval))
+    return out
+
+def _download_batch(symbols: Sequence[str], period: str, interval: str) -> Dict[str, pd.DataFrame]:
+    if not symbols:
+        return {}
+    try:
+        raw = yf.download(" ".join(symbols), period=period, interval=interval, group_by="ticker",
+                          auto_adjust=False, progress=False, threads=True)
+    except Exception:
+        return {}
+    if not isinstance(raw, pd.DataFrame) or raw.empty:
+        return {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        frames = {symbols[0]: raw}
+    else:
+        present = set(raw.columns.get_level_values(0))
+        frames = {s: raw[s] for s in symbols if s in present}
+    out = {}
+    for s, df in frames.items():
+        df = _ohlcv(df.copy())
+        if not df.empty:
+            out[s] = df
+    return out
+
 def _safe_last(hist: pd.DataFrame) -> Optional[float]:
     try:
         return float(hist["Close"].iloc[-1])
@@ -151,8 +202,11 @@ def _history_52w(symbol: str) -> pd.DataFrame:
         pass
     return pd.DataFrame()
 
-def analyze_one_ticker(symbol: str) -> Optional[TickerCard]:
-    hist_d = _history(symbol)
+def analyze_one_ticker(symbol: str, hist_d: Optional[pd.DataFrame] = None,
+                       hist_52: Optional[pd.DataFrame] = None) -> Optional[TickerCard]:
+    """Pass hist_d / hist_52 when already fetched (see scan_many) to skip the per-symbol downloads."""
+    if hist_d is None or hist_d.empty:
+        hist_d = _history(symbol)
     if hist_d.empty:
         log.warning("No history for %s", symbol)
         return None
@@ -165,10 +219,15 @@ def analyze_one_ticker(symbol: str) -> Optional[TickerCard]:
     ind = _compute_indicators(hist_d)
     volx = _volume_vs_avg20(hist_d)
 
-    hist_52 = _history_52w(symbol)
+    if hist_52 is None:
+        hist_52 = _history_52w(symbol)
     r52 = None
     if not hist_52.empty:
-        r52 = (float(hist_52["Low"].min()), float(hist_52["High"].max()))
+        # Only the trailing-252 extreme is needed: one vectorized reduction, no rolling series.
+        low = hist_52["Low"].to_numpy(dtype=np.float64)[-252:]
+        high = hist_52["High"].to_numpy(dtype=np.float64)[-252:]
+        if not (np.isnan(low).all() or np.isnan(high).all()):
+            r52 = (float(np.nanmin(low)), float(np.nanmax(high)))
 
     def _gt(a, b):
         try:
@@ -192,89 +251,173 @@ def analyze_one_ticker(symbol: str) -> Optional[TickerCard]:
         why=why, option=option
     )
 
+def scan_many(symbols: Sequence[str]) -> List[TickerCard]:
+    """
+    analyze_one_ticker over many symbols with two batched downloads (6mo and 1y
+    daily) instead of two requests per symbol. Symbols the batch missed fall back
+    to the single-symbol loaders.
+    """
+    symbols = [s.upper() for s in symbols]
+    daily = _batch_history(symbols, period="6mo")
+    yearly = _batch_history(symbols, period="1y")
+    cards = []
+    for sym in symbols:
+        card = analyze_one_ticker(sym, hist_d=daily.get(sym), hist_52=yearly.get(sym))
+        if card is not None:
+            cards.append(card)
+    return cards
+
 # ---------- Earnings ----------
 def _load_earnings_cache() -> Dict[str, Dict]:
     if os.path.exists(EARNINGS_CACHE):
         try:
-            with open(EARNINGS_CACHE, "r") as f:
-                return json.load(f)
+            with open(EARNINGS_CACHE, "rb") as f:
+                return orjson.loads(f.read())
         except Exception:
             pass
     return {}
 
 def _save_earnings_cache(data: Dict[str, Dict]):
     tmp = EARNINGS_CACHE + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(data, f)
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(data))
     os.replace(tmp, EARNINGS_CACHE)
 
 def _next_earnings_from_df(df: pd.DataFrame) -> Optional[dt.date]:
     try:
         if df is None or df.empty:
             return None
-        fut = [d.to_pydatetime().date() for d in df.index if d.to_pydatetime().date() >= _now_utc_date()]
+        # index.date converts the whole index once; no per-row Timestamp round trips
+        today = _now_utc_date()
+        fut = [d for d in df.index.date if d >= today]
         return min(fut) if fut else None
     except Exception:
         return None
 
-def _earnings_fetch_one(symbol: str) -> Optional[str]:
+EARNINGS_THREADS = 16          # concurrent Yahoo lookups; I/O-bound, so threads not processes
+EARNINGS_MIN_INTERVAL = 0.03   # seconds between request starts across all threads (~33 req/s)
+_pace_lock = threading.Lock()
+_next_slot = 0.0
+
+def _pace():
+    """Shared pacer: threads overlap latency, but request starts stay spaced out."""
+    global _next_slot
+    with _pace_lock:
+        now = time.monotonic()
+        wait = _next_slot - now
+        _next_slot = max(now, _next_slot) + EARNINGS_MIN_INTERVAL
+    if wait > 0:
+        time.sleep(wait)
+
+def _earnings_fetch_one(symbol: str) -> Tuple[Optional[str], bool]:
+    """(next earnings ISO date or None, ok); ok is False when the lookup errored (e.g. 429)."""
+    _pace()
     try:
         df = yf.Ticker(symbol).get_earnings_dates(limit=8)
-        nxt = _next_earnings_from_df(df)
-        return nxt.isoformat() if nxt else None
     except Exception:
-        return None
+        return None, False
+    nxt = _next_earnings_from_df(df)
+    return (nxt.isoformat() if nxt else None), True
+
+def _batch_earnings(symbols: Sequence[str], threads: Optional[int] = None) -> Iterator[Tuple[str, Optional[str], bool]]:
+    """
+    Yield (symbol, next earnings ISO date, ok) for each symbol, in input order, with
+    lookups fanned out over a thread pool. threads=None sizes the pool automatically.
+    """
+    if not symbols:
+        return
+    workers = threads or min(EARNINGS_THREADS, len(symbols))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for sym, (d, ok) in zip(symbols, ex.map(_earnings_fetch_one, symbols)):
+            yield sym, d, ok
 
-def refresh_all_caches():
-    universe = ensure_universe()
+EARNINGS_SOFT_TTL = 24 * 3600  # entries older than this are served, then refreshed in the background
+# Held by whichever refresh is writing EARNINGS_CACHE, so at most one runs at a time.
+_refresh_lock = threading.Lock()
+
+def _refresh_earnings(symbols: Sequence[str]):
     cache = _load_earnings_cache()
-    for i, sym in enumerate(universe, start=1):
-        cache[sym] = {"date": _earnings_fetch_one(sym), "ts": time.time()}
+    for i, (sym, d, ok) in enumerate(_batch_earnings(symbols), start=1):
+        if ok:  # failed lookups aren't persisted, so they're retried next refresh
+            cache[sym] = {"date": d, "ts": time.time()}
         if i % 50 == 0:
             _save_earnings_cache(cache)
-        time.sleep(0.03)
     _save_earnings_cache(cache)
 
+def refresh_all_caches():
+    universe = ensure_universe()
+    with _refresh_lock:
+        _refresh_earnings(universe)
+
+def _background_refresh(symbols: Sequence[str]):
+    try:
+        _refresh_earnings(symbols)
+    except Exception:
+        log.exception("Background earnings refresh failed")
+    finally:
+        _refresh_lock.release()
+
+def _spawn_refresh(symbols: Sequence[str]) -> bool:
+    """Start a background refresh of symbols unless one is already running."""
+    if not symbols or not _refresh_lock.acquire(blocking=False):
+        return False
+    threading.Thread(target=_background_refresh, args=(list(symbols),),
+                     name="earnings-refresh", daemon=True).start()
+    return True
+
+def _window_rows(universe: Sequence[str], cache: Dict[str, Dict], days: int) -> List[Dict]:
+    # One vectorized parse + day-delta over the whole universe; unparseable/missing -> NaT (never matches)
+    dates = pd.to_datetime(pd.Series([cache.get(sym, {}).get("date") for sym in universe],
+                                     index=universe, dtype=object),
+                           format="%Y-%m-%d", errors="coerce")
+    hits = dates[(dates - pd.Timestamp(_now_utc_date())).dt.days.abs() <= days]
+    out = [{"symbol": sym, "date": ts.date()} for sym, ts in hits.items()]
+    out.sort(key=lambda x: (x["date"], x["symbol"]))
+    return out
+
 def earnings_universe_window(days: int) -> List[Dict]:
+    """
+    Stale-while-revalidate: warm caches answer immediately and stale/missing
+    symbols are refetched in a background thread. Only a cold cache blocks,
+    on a modest first batch.
+    """
     universe = ensure_universe()
     cache = _load_earnings_cache()
-    stale_cut = time.time() - 24 * 3600
+    stale_cut = time.time() - EARNINGS_SOFT_TTL
     to_fetch = [s for s in universe if (s not in cache) or (cache[s].get("ts", 0) < stale_cut)]
 
-    # modest batch to keep interactions snappy; background task will fill the rest
-    for sym in to_fetch[:500]:
-        cache[sym] = {"date": _earnings_fetch_one(sym), "ts": time.time()}
-        time.sleep(0.03)
-    _save_earnings_cache(cache)
-
-    out = []
-    today = _now_utc_date()
-    for sym in universe:
-        d = cache.get(sym, {}).get("date")
-        if isinstance(d, str):
-            try: d = dt.datetime.strptime(d, "%Y-%m-%d").date()
-            except Exception: d = None
-        if isinstance(d, dt.date):
-            if abs((d - today).days) <= days:
-                out.append({"symbol": sym, "date": d})
-    out.sort(key=lambda x: (x["date"], x["symbol"]))
-    return out
+    if to_fetch and not any(s in cache for s in universe):
+        # Cold: nothing to serve yet. Fetch a first batch inline (skipped if a
+        # refresh already holds the cache), hand the remainder to the background.
+        if _refresh_lock.acquire(blocking=False):
+            try:
+                for sym, d, ok in _batch_earnings(to_fetch[:500]):
+                    if ok:
+                        cache[sym] = {"date": d, "ts": time.time()}
+                _save_earnings_cache(cache)
+            finally:
+                _refresh_lock.release()
+            to_fetch = to_fetch[500:]
+    _spawn_refresh(to_fetch)
+    return _window_rows(universe, cache, days)
 
 # ---------- Discord Embeds ----------
 import discord
 
+# x == x is False only for NaN (float or numpy), so one comparison covers None and NaN.
 def _fmt_pct(x: Optional[float]) -> str:
-    return "—" if x is None else f"{x:+.2f}%"
+    return f"{x:+.2f}%" if x is not None and x == x else "—"
 
 def _fmt_f(v: Optional[float], prec=2) -> str:
-    try:
-        if v is None or (isinstance(v, float) and math.isnan(v)): return "—"
-        return f"{v:.{prec}f}"
-    except Exception:
-        return "—"
+    return f"{v:.{prec}f}" if v is not None and v == v else "—"
+
+# Shared Colour instances instead of a new one per embed
+_BIAS_COLORS = {"CALL": discord.Colour(0x2ECC71), "PUT": discord.Colour(0xE74C3C)}
+_NEUTRAL_COLOR = discord.Colour(0x999999)
+_EARNINGS_COLOR = discord.Colour(0xF1C40F)
 
 def render_ticker_embed(card: TickerCard) -> discord.Embed:
-    c = 0x2ECC71 if card.bias == "CALL" else (0xE74C3C if card.bias == "PUT" else 0x999999)
+    c = _BIAS_COLORS.get(card.bias, _NEUTRAL_COLOR)
     e = discord.Embed(title=f"{card.symbol} • {card.bias}", color=c)
     e.add_field(name="Last", value=f"${_fmt_f(card.last)}", inline=True)
     e.add_field(name="1D / 5D / 1M", value=f"{_fmt_pct(card.d1)} / {_fmt_pct(card.d5)} / {_fmt_pct(card.d21)}", inline=True)
@@ -288,7 +431,7 @@ def render_ticker_embed(card: TickerCard) -> discord.Embed:
     return e
 
 def render_earnings_page_embed(page: List[Dict], days: int, page_num: int, total_pages: int) -> discord.Embed:
-    e = discord.Embed(title=f"Earnings within ±{days} days", color=0xF1C40F)
+    e = discord.Embed(title=f"Earnings within ±{days} days", color=_EARNINGS_COLOR)
     e.description = "\n".join(f"• **{r['symbol']}** — {r['date'].isoformat()}" for r in page)
     e.set_footer(text=f"Page {page_num}/{total_pages} • Source: yfinance • cached 12h")
     return e
@@ -3,18 +3,19 @@ import logging
 logging.getLogger("yfinance").setLevel(logging.CRITICAL)
 
 import yfinance as yf, pandas as pd, numpy as np
-import datetime as dt, pytz
+import datetime as dt, pytz, time, re
+from concurrent.futures import ThreadPoolExecutor
 from ta.momentum import RSIIndicator
 from ta.trend import MACD, EMAIndicator
 
 NY = pytz.timezone("America/New_York")
 
-UNIVERSE = [
+UNIVERSE = (
     "SPY","QQQ","NVDA","TSLA","AAPL","MSFT","META","AMD","AMZN","GOOGL",
     "NFLX","AVGO","JPM","BA","SMCI","ORCL","CRM","ADBE","COST","WMT",
     "XOM","CVX","UNH","HD","KO","PEP","INTC","NKE","PYPL","MRNA",
     "T","V","MA","PLTR","MU","ABBV","LLY","UNP","CAT","GS","SHOP"
-]
+)
 
 MIN_PRICE = 5.0
 MIN_AVG_DAILY_VOL = 2e6
@@ -32,6 +33,36 @@ TARGET_EXP_MAX_DAYS = 14
 ETF_TICKERS = {"SPY","QQQ","IWM","DIA","XLK","XLE","XLF","XLV","XLY","XLI","XLP","XLB","XLU","XLC"}
 POS = {"surge","beat","beats","strong","upgrade","record","growth","bull","rally","up"}
 NEG = {"miss","misses","downgrade","weak","lawsuit","probe","fall","drop","down","cuts","cut"}
+# Built once at import: one C-level scan per headline instead of a Python loop over
+# every keyword. Plain alternation keeps the substring semantics of `w in t`.
+MAX_TITLE_LEN = 300   # real headlines are well under this
+_POS_RE = re.compile("|".join(map(re.escape, sorted(POS))))
+_NEG_RE = re.compile("|".join(map(re.escape, sorted(NEG))))
+
+# yf.Ticker memoizes .info/.options/.news per instance; one instance per symbol lets
+# news, ETF check, earnings and option lookups in a scan share those fetches.
+TICKER_TTL = 300
+NEWS_TTL = 60
+_TICKERS = {}   # tkr -> (ts, yf.Ticker)
+_NEWS = {}      # tkr -> (ts, [news items])
+
+def get_ticker(tkr):
+    now = time.monotonic()
+    hit = _TICKERS.get(tkr)
+    if hit and now - hit[0] < TICKER_TTL:
+        return hit[1]
+    t = yf.Ticker(tkr)
+    _TICKERS[tkr] = (now, t)
+    return t
+
+def get_news(tkr):
+    now = time.monotonic()
+    hit = _NEWS.get(tkr)
+    if hit and now - hit[0] < NEWS_TTL:
+        return hit[1]
+    items = get_ticker(tkr).news or []
+    _NEWS[tkr] = (now, items)
+    return items
 
 def _to_float(x): 
     return float(x.item() if hasattr(x,"item") else x)
@@ -77,9 +108,12 @@ def add_indicators(df):
 
 def news_score(tkr, n=12):
     try:
-        ttl = [(x.get("title","") or "").lower() for x in (yf.Ticker(tkr).news or [])[:n]]
-        return (sum(any(w in t for w in POS) for t in ttl)
-               -sum(any(w in t for w in NEG) for t in ttl)), (ttl[0] if ttl else "")
+        # cap before lower()/search so one oversized feed entry can't stall the scan;
+        # dict.fromkeys drops syndicated repeats so one story isn't counted twice
+        ttl = list(dict.fromkeys(t for t in ((x.get("title","") or "")[:MAX_TITLE_LEN].lower()
+                                             for x in get_news(tkr)[:2*n]) if t))[:n]
+        return (sum(1 for t in ttl if _POS_RE.search(t))
+               -sum(1 for t in ttl if _NEG_RE.search(t))), (ttl[0] if ttl else "")
     except:
         return 0, ""
 
@@ -93,7 +127,7 @@ def is_etf(tkr):
     if tkr.upper() in ETF_TICKERS:
         return True
     try:
-        info = yf.Ticker(tkr).info or {}
+        info = get_ticker(tkr).info or {}
         return str(info.get("quoteType","")).upper()=="ETF"
     except:
         return False
@@ -101,11 +135,11 @@ def is_etf(tkr):
 def earnings_window_flag(tkr, window_days=3):
     try:
         if is_etf(tkr): return (False,"")
-        tk = yf.Ticker(tkr)
+        tk = get_ticker(tkr)
         try:
             df = tk.get_earnings_dates(limit=6)
             if df is not None and not df.empty:
-                dates = sorted([d.to_pydatetime().date() for d in df.index])
+                dates = sorted(df.index.date)
                 today=dt.date.today()
                 nearest=min(dates,key=lambda d:abs((d-today).days))
                 return (trading_days_between(today,nearest)<=window_days, nearest.isoformat())
@@ -127,17 +161,28 @@ def earnings_window_flag(tkr, window_days=3):
     except:
         return (False,"")
 
+def _liquidity_ok(d):
+    if d is None or d.empty: return False
+    last = d.iloc[-1]
+    px   = _to_float(last["Close"])
+    avgv = _to_float(d["Volume"].tail(20).mean())
+    return (px >= MIN_PRICE) and (avgv >= MIN_AVG_DAILY_VOL)
+
 def daily_liquidity_ok(tkr):
     try:
         d=yf.download(tickers=tkr,period="60d",interval="1d",auto_adjust=False,progress=False)
-        if d.empty: return False
-        last = d.iloc[-1]
-        px   = _to_float(last["Close"])
-        avgv = _to_float(d["Volume"].tail(20).mean())
-        return (px >= MIN_PRICE) and (avgv >= MIN_AVG_DAILY_VOL)
+        return _liquidity_ok(d)
     except:
         return False
 
+def liquidity_map(tickers):
+    """{ticker: bool} from one batched 60d daily download; per-ticker fetch only for names the batch dropped."""
+    try:
+        daily = normalize(dl_prices(tickers, period="60d", interval="1d"), tickers)
+    except:
+        daily = {}
+    return {t: (_liquidity_ok(daily[t]) if t in daily else daily_liquidity_ok(t)) for t in tickers}
+
 def score_row(row, nscore):
     trend = (2 if row["Close"]>row["EMA20"]>row["EMA50"] else -2 if row["Close"]<row["EMA20"]<row["EMA50"] else 0)
     momentum = 1 if row["MACD_H"]>0 else -1
@@ -159,7 +204,7 @@ def levels_from_atr(price, atrp, bias):
 
 def nearest_target_expiration(ticker, min_days=TARGET_EXP_MIN_DAYS, max_days=TARGET_EXP_MAX_DAYS):
     try:
-        exps = yf.Ticker(ticker).options
+        exps = get_ticker(ticker).options
         if not exps: return None
         today=dt.date.today()
         to_date=lambda s: dt.date(*map(int, s.split("-")))
@@ -174,7 +219,7 @@ def pick_option_contract(ticker, bias, spot):
     try:
         exp = nearest_target_expiration(ticker)
         if not exp: return None
-        chain = yf.Ticker(ticker).option_chain(exp)
+        chain = get_ticker(ticker).option_chain(exp)
         tbl = chain.puts if bias=="PUT" else chain.calls
         if tbl.empty: return None
         t=tbl.copy()
@@ -194,63 +239,71 @@ def pick_option_contract(ticker, bias, spot):
     except:
         return None
 
+def _scan_one(tkr, df):
+    """Score one liquid ticker -> result row, or None. Network-bound (news, earnings, option chain)."""
+    try:
+        df=add_indicators(df).dropna()
+        if df.empty:
+            return None
+        last=df.iloc[-1]
+        price=_to_float(last["Close"]); atrp=_to_float(last["ATRp"])
+        nsc, ex = news_score(tkr); 
+        total = score_row(last,nsc); 
+        bias  = bias_from_score(total)
+        entry, target, stop = levels_from_atr(price, atrp, bias)
+        earn_flag, earn_date = earnings_window_flag(tkr, 3)
+
+        reasons=[]
+        reasons.append("Uptrend (Close>EMA20>EMA50)" if last["Close"]>last["EMA20"]>last["EMA50"]
+                       else ("Downtrend (Close<EMA20<EMA50)" if last["Close"]<last["EMA20"]<last["EMA50"] else "Mixed trend"))
+        reasons.append("MACD momentum up" if last["MACD_H"]>0 else "MACD momentum down")
+        reasons.append(f"RSI {float(last['RSI']):.1f}")
+        if last["Volume"]>2*last["VOL20"]: reasons.append("Unusual volume")
+        elif last["Volume"]>1.5*last["VOL20"]: reasons.append("Volume > 1.5× avg")
+        else: reasons.append("Moderate volume")
+        if atrp>3: reasons.append(f"High range ~{atrp:.1f}%")
+        reasons.append("News positive" if nsc>0 else ("News negative" if nsc<0 else "News neutral/low-signal"))
+        if ex: reasons.append(f"Ex: {ex[:60]}…")
+        if earn_flag: reasons.append(f"Earnings window (±3d: {earn_date})")
+
+        pick=pick_option_contract(tkr, bias, price)
+        ok=False; exp="N/A"; note="no pick"
+        sym=strike=mid=sp=ov=oi=""
+        if pick:
+            exp=pick.get("expiration","N/A")
+            if "note" in pick: note=pick["note"]
+            else:
+                sym=pick["contract"]; strike=round(pick["strike"],2)
+                mid=pick["mid"]; sp=pick["spread_pct"]; ov=pick["volume"]; oi=pick["openInterest"]; ok=True
+
+        return {"Ticker":tkr,"Price":round(price,2),"Type":bias,
+                "Target Expiration":exp,"Buy Range":f"${entry[0]}–${entry[1]}",
+                "Sell Target":f"${target}","Stop Idea":f"${stop}",
+                "Risk":("High" if (atrp>=4 or abs(nsc)>=2 or earn_flag) else "Medium"),
+                "Why":"; ".join(reasons),
+                "Option Contract":sym,"Strike":strike,"Opt Mid":mid,"Spread %":sp,
+                "Opt Vol":ov,"Opt OI":oi,"Opt Note":note,"ScoreAbs":abs(total),"ok_contract":ok}
+    except:
+        return None
+
+SCAN_THREADS = 8   # tickers scored concurrently; each does several Yahoo round trips
+
 def run_scan(top_k=10):
     data, used_period, used_interval = safe_download(UNIVERSE)
-    rows=[]
-    for tkr, df in data.items():
-        try:
-            df=add_indicators(df).dropna()
-            if df.empty or not daily_liquidity_ok(tkr):
-                continue
-            last=df.iloc[-1]
-            price=_to_float(last["Close"]); atrp=_to_float(last["ATRp"])
-            nsc, ex = news_score(tkr); 
-            total = score_row(last,nsc); 
-            bias  = bias_from_score(total)
-            entry, target, stop = levels_from_atr(price, atrp, bias)
-            earn_flag, earn_date = earnings_window_flag(tkr, 3)
-
-            reasons=[]
-            reasons.append("Uptrend (Close>EMA20>EMA50)" if last["Close"]>last["EMA20"]>last["EMA50"]
-                           else ("Downtrend (Close<EMA20<EMA50)" if last["Close"]<last["EMA20"]<last["EMA50"] else "Mixed trend"))
-            reasons.append("MACD momentum up" if last["MACD_H"]>0 else "MACD momentum down")
-            reasons.append(f"RSI {float(last['RSI']):.1f}")
-            if last["Volume"]>2*last["VOL20"]: reasons.append("Unusual volume")
-            elif last["Volume"]>1.5*last["VOL20"]: reasons.append("Volume > 1.5× avg")
-            else: reasons.append("Moderate volume")
-            if atrp>3: reasons.append(f"High range ~{atrp:.1f}%")
-            reasons.append("News positive" if nsc>0 else ("News negative" if nsc<0 else "News neutral/low-signal"))
-            if ex: reasons.append(f"Ex: {ex[:60]}…")
-            if earn_flag: reasons.append(f"Earnings window (±3d: {earn_date})")
-
-            pick=pick_option_contract(tkr, bias, price)
-            ok=False; exp="N/A"; note="no pick"
-            sym=strike=mid=sp=ov=oi=""
-            if pick:
-                exp=pick.get("expiration","N/A")
-                if "note" in pick: note=pick["note"]
-                else:
-                    sym=pick["contract"]; strike=round(pick["strike"],2)
-                    mid=pick["mid"]; sp=pick["spread_pct"]; ov=pick["volume"]; oi=pick["openInterest"]; ok=True
-
-            rows.append({"Ticker":tkr,"Price":round(price,2),"Type":bias,
-                         "Target Expiration":exp,"Buy Range":f"${entry[0]}–${entry[1]}",
-                         "Sell Target":f"${target}","Stop Idea":f"${stop}",
-                         "Risk":("High" if (atrp>=4 or abs(nsc)>=2 or earn_flag) else "Medium"),
-                         "Why":"; ".join(reasons),
-                         "Option Contract":sym,"Strike":strike,"Opt Mid":mid,"Spread %":sp,
-                         "Opt Vol":ov,"Opt OI":oi,"Opt Note":note,"ScoreAbs":abs(total),"ok_contract":ok})
-        except:
-            continue
+    liquid = liquidity_map(list(data))
+    todo = [(t, df) for t, df in data.items() if liquid.get(t)]
+    rows = []
+    if todo:
+        with ThreadPoolExecutor(max_workers=min(SCAN_THREADS, len(todo))) as ex:
+            rows = [r for r in ex.map(lambda td: _scan_one(*td), todo) if r is not None]
 
     if not rows:
         return pd.DataFrame(), f"Used data: period={used_period}, interval={used_interval}. No candidates."
 
-    df=pd.DataFrame(rows)
-    good=df[df["ok_contract"]==True].copy()
-    if good.empty:
-        view=df.sort_values(["ScoreAbs","Risk"],ascending=[False,True]).head(top_k)
-    else:
-        view=good.sort_values(["ScoreAbs","Risk"],ascending=[False,True]).head(top_k)
+    # Rank the plain row dicts (a few dozen) and build a frame of the top_k only:
+    # ScoreAbs desc, then Risk asc ("High" < "Medium"); sort is stable like sort_values.
+    good=[r for r in rows if r["ok_contract"]] or rows
+    good.sort(key=lambda r:(-r["ScoreAbs"], r["Risk"]))
+    view=pd.DataFrame(good[:top_k])
 
     return view, f"Used data: period={used_period}, interval={used_interval}"
@@ -1,22 +1,31 @@
 import os
 import asyncio
+import functools
+import hashlib
 import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
-import pandas as pd
-import yfinance as yf
-
-# Tech indicators
-from ta.trend import EMAIndicator, MACD
-from ta.momentum import RSIIndicator
+import numpy as np
+import orjson
+from aiolimiter import AsyncLimiter
 
 # Our universe manager (loads symbols list from data/symbols_robinhood.txt, or env fallback)
 from utils.universe import UniverseManager
+# utils.yf_cache (disk + memory cache in front of yfinance) pulls in pandas and
+# yfinance, ~1-2 s of imports; it is imported inside the thread-side functions
+# that use it so login and /ping don't wait on that graph.
+# NumPy ports of the ta EMA/RSI/MACD indicators
+from utils.indicators import ema, rsi as rsi_arr, macd_diff
 
 # ------------------------------------------------------------
 # Logging / basic config
@@ -27,98 +36,342 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)7s] %(name)s: %(message)s",
 )
 logger = logging.getLogger("bot")
+# The format above only uses time/level/name/message. Skip collecting the rest per
+# record (see "Optimization" in the logging HOWTO): no caller-frame walk, pid or thread info.
+logging._srcfile = None
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 
 TOKEN = os.getenv("DISCORD_BOT_TOKEN", "")
 GUILD_ID = os.getenv("DISCORD_GUILD_ID", "")  # optional, speeds up slash command sync
 CHANNEL_ID = os.getenv("DISCORD_CHANNEL_ID", "")  # optional default posting channel
 KEEP_ALIVE = os.getenv("KEEP_ALIVE", "True").lower() == "true"
+HEAVY_CONCURRENCY = int(os.getenv("HEAVY_COMMAND_CONCURRENCY", "2"))  # concurrent /earnings_watch scans per process
+SCAN_CONCURRENCY = int(os.getenv("SCAN_COMMAND_CONCURRENCY", "4"))    # concurrent /scan_ticker bodies per process
+EARNINGS_PAGE_SIZE = 25   # lines per earnings embed page
+MAX_INFLIGHT_SENDS = 3    # concurrent followup posts per command
+YF_CONCURRENCY = int(os.getenv("YF_CONCURRENCY", "8"))  # Yahoo requests in flight per process
+MAX_EMBEDS_PER_MESSAGE = 10  # Discord per-message embed limits
+MAX_EMBED_CHARS = 6000
+ANALYZE_TTL = int(os.getenv("TICKER_TTL_S", "60"))  # seconds a /scan_ticker result is reused
+EARNINGS_TTL = 6 * 3600   # seconds a per-symbol earnings answer is reused
+EARNINGS_SCAN_TIMEOUT = int(os.getenv("EARNINGS_SCAN_TIMEOUT", "600"))  # wall-clock cap for one /earnings_watch scan
+EARNINGS_PAGES_TTL = 300  # seconds rendered /earnings_watch pages are re-sent as-is
+EARNINGS_PAGES_STALE = EARNINGS_TTL  # up to this age they're still sent, then refreshed in the background
+# Extra user IDs allowed to run /sync besides the guild owner / manage_guild holders
+ADMIN_USER_IDS = frozenset(int(x) for x in os.getenv("ADMIN_USER_IDS", "").replace(",", " ").split() if x.isdigit())
+BLOCKING_WORKERS = int(os.getenv("IO_WORKERS", "16"))  # threads behind asyncio.to_thread (yfinance, symbol generator)
+# Same private default as utils.yf_cache (not imported here: it pulls in yfinance)
+CACHE_DIR = os.getenv("CACHE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "premarket_scanner")
+COMMANDS_STAMP = os.path.join(CACHE_DIR, "commands_hash")
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "") == "1"
 
 if not TOKEN:
     logger.error("DISCORD_BOT_TOKEN is not set. Exiting.")
     raise SystemExit(1)
 
+# Parsed once; on_ready fires again on every reconnect.
+_GUILD_OBJ = discord.Object(id=int(GUILD_ID)) if GUILD_ID else None
+# Reconnect storms can fire overlapping on_ready/sync calls; sync one at a time.
+_SYNC_LOCK = asyncio.Lock()
+
 intents = discord.Intents.default()
 # If you ever need member/guild cache, enable more intents here.
-bot = commands.Bot(command_prefix="!", intents=intents)
+class ScannerBot(commands.Bot):
+    async def setup_hook(self) -> None:
+        # Runs once per process, after login and before the gateway connects;
+        # on_ready re-fires on every reconnect, so one-time work lives here.
+        await _startup()
+
+    async def close(self) -> None:
+        await super().close()
+        # Don't let shutdown wait on queued Yahoo lookups nobody will read.
+        _blocking_pool.shutdown(wait=False, cancel_futures=True)
+
+bot = ScannerBot(command_prefix="!", intents=intents)
 tree = bot.tree
 
 universe = UniverseManager()
 
+# Command bodies run as background tasks (see _spawn) gated by these semaphores,
+# so one long scan can't hold the gateway callback or pile up unbounded work.
+# Separate gates: minutes-long earnings scans must not queue sub-second /scan_ticker.
+_heavy_sem = asyncio.Semaphore(HEAVY_CONCURRENCY)
+_scan_sem = asyncio.Semaphore(SCAN_CONCURRENCY)
+# Default executor for to_thread (installed in _startup, shut down in ScannerBot.close).
+_blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+_background_tasks = set()
+# Outbound limits: Yahoo lookups in flight, and multi-message followup bursts
+# (Discord allows ~5 messages / 5 s per channel before answering 429, so the
+# bucket is per channel: a long scan in one channel doesn't stall another).
+_yf_sem = asyncio.Semaphore(YF_CONCURRENCY)
+_channel_limiters: Dict[int, AsyncLimiter] = {}
+
 # ------------------------------------------------------------
 # Small helpers
 # ------------------------------------------------------------
-def _chunk(lst: List[str], n: int):
-    """Yield successive n-sized chunks from list."""
-    for i in range(0, len(lst), n):
-        yield lst[i:i + n]
-
-async def _safe_followup(interaction: discord.Interaction, content: Optional[str] = None, embed: Optional[discord.Embed] = None):
+async def _safe_followup(interaction: discord.Interaction, content: Optional[str] = None,
+                         embed: Optional[discord.Embed] = None, ephemeral: bool = False):
+    """Single reply path for every command (after defer)."""
     try:
         if embed:
-            await interaction.followup.send(embed=embed)
+            await interaction.followup.send(embed=embed, ephemeral=ephemeral)
         else:
-            await interaction.followup.send(content or "\u200b")
+            await interaction.followup.send(content or "\u200b", ephemeral=ephemeral)
+    except discord.HTTPException:
+        logger.exception("Failed to send followup message.")
+
+def _channel_limiter(channel_id: Optional[int]) -> AsyncLimiter:
+    key = channel_id or 0
+    lim = _channel_limiters.get(key)
+    if lim is None:
+        lim = _channel_limiters[key] = AsyncLimiter(5, 5)
+    return lim
+
+def _pack_embeds(embeds: List[discord.Embed]) -> List[List[discord.Embed]]:
+    """Group embeds into messages within Discord's 10-embed / 6000-char per-message limits."""
+    groups: List[List[discord.Embed]] = []
+    cur: List[discord.Embed] = []
+    size = 0
+    for e in embeds:
+        n = len(e)  # discord.py: total characters counted against the 6000 limit
+        if cur and (len(cur) == MAX_EMBEDS_PER_MESSAGE or size + n > MAX_EMBED_CHARS):
+            groups.append(cur)
+            cur, size = [], 0
+        cur.append(e)
+        size += n
+    if cur:
+        groups.append(cur)
+    return groups
+
+async def _send_embeds(interaction: discord.Interaction, embeds: List[discord.Embed]):
+    """
+    Embeds are packed up to 10 per message. The first message goes alone (it
+    resolves the deferred "thinking" reply); any further messages are posted
+    concurrently so total time is ~1 RTT plus rate-limit waits, not N RTTs.
+    """
+    groups = _pack_embeds(embeds)
+    if not groups:
+        return
+    try:
+        await interaction.followup.send(embeds=groups[0])
     except discord.HTTPException:
         logger.exception("Failed to send followup message.")
+        return
+    sem = asyncio.Semaphore(MAX_INFLIGHT_SENDS)
+    limiter = _channel_limiter(interaction.channel_id)
+
+    # 429s that still happen are slept out and retried inside discord.py's HTTP client.
+    async def one(group: List[discord.Embed]):
+        async with sem, limiter:
+            await interaction.followup.send(embeds=group)
+
+    # TaskGroup: if one message fails (e.g. the interaction token expired) the
+    # sibling sends are cancelled instead of posting a partial set one by one.
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for group in groups[1:]:
+                tg.create_task(one(group))
+    except* discord.HTTPException as eg:
+        logger.error("Paged followup failed; remaining pages cancelled.", exc_info=eg.exceptions[0])
 
 def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
+def _on_task_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background command failed", exc_info=task.exception())
+
+async def _report_failure(interaction: discord.Interaction, original: BaseException):
+    """Log a command failure and tell the user, whether or not the interaction was deferred."""
+    cmd = interaction.command.name if interaction.command else "?"
+    logger.error("Command /%s failed", cmd, exc_info=original)
+    msg = f"Command failed: {original}"
+    try:
+        if interaction.response.is_done():
+            await interaction.followup.send(msg, ephemeral=True)
+        else:
+            await interaction.response.send_message(msg, ephemeral=True)
+    except discord.HTTPException:
+        pass  # interaction expired (10062) or already answered; the log line is all we can do
+
+async def _guarded(coro, interaction: discord.Interaction):
+    # Detached jobs are outside the tree's error dispatch: report failures the
+    # same way on_app_command_error does, so the user isn't left on "thinking…".
+    try:
+        await coro
+    except Exception as e:
+        await _report_failure(interaction, e)
+
+def _spawn(coro, interaction: Optional[discord.Interaction] = None) -> asyncio.Task:
+    """
+    Run a command body in the background; the handler returns right after defer().
+    Pass the interaction so a failure is answered instead of only logged.
+    """
+    task = asyncio.create_task(_guarded(coro, interaction) if interaction else coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_task_done)
+    return task
+
+# Result cache for expensive command work: key -> (monotonic ts, value), kept in
+# write order so the bound evicts the oldest entries in O(1).
+# Concurrent misses share one in-flight task, so N identical requests do the work
+# once and all see the same result (or the same exception).
+_RESULT_CACHE: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+_RESULT_CACHE_MAX = 10000
+_INFLIGHT: Dict[str, asyncio.Task] = {}
+
+def _store_result(key: str, value: Any) -> None:
+    _RESULT_CACHE[key] = (time.monotonic(), value)
+    _RESULT_CACHE.move_to_end(key)
+    while len(_RESULT_CACHE) > _RESULT_CACHE_MAX:
+        _RESULT_CACHE.popitem(last=False)
+
+def _fetch_task(key: str, factory: Callable[[], Awaitable[Any]],
+                keep: Optional[Callable[[Any], bool]] = None) -> asyncio.Task:
+    """The in-flight fetch for key, started if there is none."""
+    task = _INFLIGHT.get(key)
+    if task is None:
+        async def run():
+            try:
+                value = await factory()
+                if keep is None or keep(value):
+                    _store_result(key, value)
+                return value
+            finally:
+                _INFLIGHT.pop(key, None)
+        task = _INFLIGHT[key] = asyncio.create_task(run())
+    return task
+
+def _on_revalidate_done(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background cache refresh failed", exc_info=task.exception())
+
+async def cached_call(key: str, ttl: float, factory: Callable[[], Awaitable[Any]],
+                      force: bool = False, stale_ttl: float = 0,
+                      keep: Optional[Callable[[Any], bool]] = None) -> Any:
+    """
+    force skips a cached hit but still joins a fetch already in flight.
+    stale_ttl > ttl enables stale-while-revalidate: an entry past ttl but younger
+    than stale_ttl is returned at once while a background fetch replaces it.
+    keep(value) False returns the value to its waiters without caching it.
+    """
+    hit = None if force else _RESULT_CACHE.get(key)
+    if hit:
+        age = time.monotonic() - hit[0]
+        if age < ttl:
+            return hit[1]
+        if age < stale_ttl:
+            task = _fetch_task(key, factory, keep)
+            task.add_done_callback(_on_revalidate_done)
+            return hit[1]
+    # shield: one caller being cancelled must not cancel the work others await
+    return await asyncio.shield(_fetch_task(key, factory, keep))
+
+def deferred(ephemeral: bool = False, thinking: bool = True):
+    """
+    Make defer() the first await of a slash-command handler, before any parsing,
+    imports or I/O, so cold starts can't blow Discord's 3s window (error 10062).
+    Handlers then reply with interaction.followup.send.
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+            await interaction.response.defer(ephemeral=ephemeral, thinking=thinking)
+            return await fn(interaction, *args, **kwargs)
+        return wrapper
+    return deco
+
 # ------------------------------------------------------------
 # Indicators / scanning logic for a single ticker
 # ------------------------------------------------------------
-def analyze_ticker_daily(ticker: str) -> Tuple[Optional[discord.Embed], Optional[str]]:
+_FEATURE_CACHE_MAX = 4096
+_RET_LOOKBACK = np.array([2, 6, 21])  # bars back for 1D / 5D / 1M
+_feature_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_feature_lock = threading.Lock()
+
+def _daily_features(ticker: str, df) -> tuple:
+    """
+    (last, 1D%, 5D%, 1M%, EMA20, EMA50, RSI14, MACD hist, Vol/Avg20) from daily bars.
+    Pure function of the bars, so results are memoized on (ticker, last bar date,
+    digest of the inputs); a revised bar changes the digest and misses naturally.
+    """
+    # Pull the columns out as arrays once; everything below is NumPy ops on them.
+    # float32 halves memory traffic; ~7 significant digits is far beyond the
+    # 2-decimal output for ~126 daily bars.
+    close = df["Close"].to_numpy(dtype=np.float32)
+    vol = df["Volume"].to_numpy(dtype=np.float32)
+
+    digest = hashlib.blake2b(close[-260:].tobytes() + vol[-20:].tobytes(), digest_size=8).hexdigest()
+    key = (ticker, df.index[-1].date().isoformat(), digest)
+    with _feature_lock:
+        hit = _feature_cache.get(key)
+        if hit is not None:
+            _feature_cache.move_to_end(key)
+            return hit
+
+    # 1D / 5D / 1M returns in one gather; 0.0 where history is too short
+    last = close[-1]
+    refs = close[-np.minimum(_RET_LOOKBACK, len(close))]
+    one_d, five_d, one_m = np.where(_RET_LOOKBACK <= len(close), (last / refs - 1.0) * 100, 0.0)
+
+    e20 = ema(close, 20)[-1]
+    e50 = ema(close, 50)[-1]
+    rsi = rsi_arr(close, 14)[-1]
+    macd_val = macd_diff(close, window_fast=12, window_slow=26, window_sign=9)[-1]
+    vol_avg20 = vol[-20:].mean()
+    vol_ratio = (vol[-1] / vol_avg20) if vol_avg20 > 0 else 1.0
+
+    out = (last, one_d, five_d, one_m, e20, e50, rsi, macd_val, vol_ratio)
+    with _feature_lock:
+        _feature_cache[key] = out
+        if len(_feature_cache) > _FEATURE_CACHE_MAX:
+            _feature_cache.popitem(last=False)
+    return out
+
+def analyze_ticker_daily(ticker: str, force: bool = False) -> Tuple[Optional[discord.Embed], Optional[str]]:
     """
     Returns (embed, error) for a single ticker using daily bars.
+    force refetches the bars instead of reading the price cache.
     """
+    from utils.yf_cache import download_history
     try:
-        df = yf.download(ticker, period="6mo", interval="1d", progress=False, auto_adjust=False)
+        df = download_history(ticker, period="6mo", interval="1d", force=force)
     except Exception as e:
         return None, f"{ticker}: download error: {e}"
 
     if df is None or df.empty or len(df) < 60:
         return None, f"{ticker}: insufficient data"
 
-    close = df["Close"].copy()
-
-    ema20 = EMAIndicator(close, window=20).ema_indicator()
-    ema50 = EMAIndicator(close, window=50).ema_indicator()
-    rsi14 = RSIIndicator(close, window=14).rsi()
-
-    macd_ind = MACD(close, window_slow=26, window_fast=12, window_sign=9)
-    macd_line = macd_ind.macd()
-    macd_signal = macd_ind.macd_signal()
-    macd_hist = macd_ind.macd_diff()
-
-    vol = df["Volume"]
-    vol_avg20 = vol.rolling(20).mean()
-
-    last = close.iloc[-1]
-    one_d = (close.iloc[-1] / close.iloc[-2] - 1.0) * 100 if len(close) >= 2 else 0.0
-    five_d = (close.iloc[-1] / close.iloc[-6] - 1.0) * 100 if len(close) >= 6 else 0.0
-    one_m = (close.iloc[-1] / close.iloc[-21] - 1.0) * 100 if len(close) >= 21 else 0.0
-
-    e20 = ema20.iloc[-1]
-    e50 = ema50.iloc[-1]
-    rsi = rsi14.iloc[-1]
-    macd_val = macd_hist.iloc[-1]
-    vol_ratio = (vol.iloc[-1] / vol_avg20.iloc[-1]) if vol_avg20.iloc[-1] > 0 else 1.0
+    last, one_d, five_d, one_m, e20, e50, rsi, macd_val, vol_ratio = _daily_features(ticker, df)
 
     # Simple bias rules – you can tune these later
+    metrics = f"MACD Δ: {macd_val:.3f}; RSI: {rsi:.1f}; Vol/Avg20: {vol_ratio:.2f}x"
     if last > e20 > e50 and macd_val > 0 and rsi >= 50:
-        bias = "CALL"
-        why = f"Close > EMA20 > EMA50; MACD Δ: {macd_val:.3f}; RSI: {rsi:.1f}; Vol/Avg20: {vol_ratio:.2f}x"
+        bias, why = "CALL", f"Close > EMA20 > EMA50; {metrics}"
     elif last < e20 < e50 and macd_val < 0 and rsi <= 50:
-        bias = "PUT"
-        why = f"Close < EMA20 < EMA50; MACD Δ: {macd_val:.3f}; RSI: {rsi:.1f}; Vol/Avg20: {vol_ratio:.2f}x"
+        bias, why = "PUT", f"Close < EMA20 < EMA50; {metrics}"
     else:
-        bias = "NEUTRAL"
-        why = f"Mixed: EMA20={e20:.2f}, EMA50={e50:.2f}; MACD Δ: {macd_val:.3f}; RSI: {rsi:.1f}; Vol/Avg20: {vol_ratio:.2f}x"
+        bias, why = "NEUTRAL", f"Mixed: EMA20={e20:.2f}, EMA50={e50:.2f}; {metrics}"
+
+    return make_signal_embed(ticker, bias, why, last, one_d, five_d, one_m, e20, e50, rsi, macd_val, vol_ratio), None
 
-    # Build a tidy embed
+# Embed colours: an int colour is wrapped in a new discord.Colour on every Embed,
+# so the few fixed ones are built once and shared.
+_COLOR_CALL = discord.Colour(0x2ECC71)
+_COLOR_PUT = discord.Colour(0xE74C3C)
+_COLOR_NEUTRAL = discord.Colour(0x95A5A6)
+_COLOR_EARNINGS = discord.Colour(0xF1C40F)
+
+def make_signal_embed(ticker: str, bias: str, why: str, last: float, one_d: float, five_d: float, one_m: float,
+                      e20: float, e50: float, rsi: float, macd_val: float, vol_ratio: float) -> discord.Embed:
+    """Tidy single-ticker embed; the only place the signal card layout lives."""
     emb = discord.Embed(
         title=f"{ticker} • {bias}",
-        color=0x2ECC71 if bias == "CALL" else (0xE74C3C if bias == "PUT" else 0x95A5A6),
+        color=_COLOR_CALL if bias == "CALL" else (_COLOR_PUT if bias == "PUT" else _COLOR_NEUTRAL),
         timestamp=_now_utc(),
     )
     emb.add_field(name="Last", value=f"${last:,.2f}", inline=True)
@@ -130,121 +383,241 @@ def analyze_ticker_daily(ticker: str) -> Tuple[Optional[discord.Embed], Optional
     emb.add_field(name="Why", value=why, inline=False)
 
     emb.set_footer(text="Premarket Scanner • daily")
-    return emb, None
+    return emb
 
 # ------------------------------------------------------------
 # Earnings watch helpers
 # ------------------------------------------------------------
-def _next_earnings_within(ticker: str, days: int) -> Optional[datetime]:
+def _known_earnings(ticker: str) -> Tuple[List[datetime], bool]:
     """
-    Try to detect the next earnings date within N days.
-    yfinance can be noisy; we try a couple approaches.
+    (all known earnings datetimes (UTC, sorted), complete) for a ticker, independent
+    of any look-ahead window. yfinance can be noisy; utils.yf_cache tries a couple
+    approaches, swallows their errors and reports complete=False instead.
     """
-    try:
-        t = yf.Ticker(ticker)
-        # 1) Use get_earnings_dates if available
-        try:
-            df = t.get_earnings_dates(limit=8)
-            if df is not None and not df.empty:
-                # df index is DatetimeIndex of event dates
-                now = datetime.now(timezone.utc)
-                horizon = now + timedelta(days=days)
-                for dt in df.index:
-                    # Normalize to timezone-aware UTC
-                    dtu = dt if dt.tzinfo else dt.tz_localize("UTC")
-                    if now <= dtu <= horizon:
-                        return dtu
-        except Exception:
-            pass
-
-        # 2) Fallback: use calendar attribute (older yfinance style)
-        cal = t.calendar
-        if isinstance(cal, pd.DataFrame) and "Earnings Date" in cal.index:
-            raw = cal.loc["Earnings Date"].values
-            if raw is not None and len(raw) >= 1:
-                ed = raw[0]
-                if isinstance(ed, (pd.Timestamp, datetime)):
-                    dtu = ed.to_pydatetime() if isinstance(ed, pd.Timestamp) else ed
-                    if dtu.tzinfo is None:
-                        dtu = dtu.replace(tzinfo=timezone.utc)
-                    now = datetime.now(timezone.utc)
-                    if now <= dtu <= now + timedelta(days=days):
-                        return dtu
-    except Exception:
-        # swallow and treat as "unknown"
-        return None
-    return None
-
-async def _earnings_scan(tickers: List[str], days: int, max_concurrency: int = 10) -> List[Tuple[str, datetime]]:
-    sem = asyncio.Semaphore(max_concurrency)
+    from utils.yf_cache import earnings_dates
+    return earnings_dates(ticker)
+
+async def _yahoo(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking Yahoo-backed call in the thread pool, at most YF_CONCURRENCY at once."""
+    async with _yf_sem:
+        return await asyncio.to_thread(fn, *args)
+
+# Thread-offloaded entry points, bound once at import: call sites await these
+# directly instead of building a to_thread lambda per request.
+_run_analyze: Callable[[str, bool], Awaitable[Tuple[Optional[discord.Embed], Optional[str]]]] = \
+    functools.partial(_yahoo, analyze_ticker_daily)
+_run_earnings: Callable[[str], Awaitable[Tuple[List[datetime], bool]]] = \
+    functools.partial(_yahoo, _known_earnings)
+
+async def _earnings_scan(tickers: Sequence[str], days: int,
+                         max_concurrency: int = 32) -> Tuple[List[Tuple[str, datetime]], bool]:
+    """(hits sorted by date, complete); complete is False if the deadline cut the scan short."""
+    # Bounded producer/consumer: a fixed pool of workers drains a queue of symbols,
+    # so a 3000-name run keeps max_concurrency coroutines alive instead of 3000 tasks.
+    queue: asyncio.Queue = asyncio.Queue()
+    for t in tickers:
+        queue.put_nowait(t)
     results: List[Tuple[str, datetime]] = []
-
-    async def worker(sym: str):
-        async with sem:
-            loop = asyncio.get_running_loop()
-            dt = await loop.run_in_executor(None, _next_earnings_within, sym, days)
+    # Cached per symbol only; the window is applied here, so runs with different
+    # `days` share entries instead of multiplying them.
+    now = _now_utc()
+    horizon = now + timedelta(days=days)
+
+    async def worker():
+        while True:
+            try:
+                sym = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                # keep: an incomplete lookup (Yahoo error/429) is used once, not cached
+                dates, _ = await cached_call(f"earnings:{sym}", EARNINGS_TTL,
+                                             functools.partial(_run_earnings, sym), keep=lambda v: v[1])
+            except Exception:
+                continue  # treat as "unknown"
+            dt = next((d for d in dates if now <= d <= horizon), None)
             if dt:
                 results.append((sym, dt))
 
-    tasks = [asyncio.create_task(worker(t)) for t in tickers]
-    await asyncio.gather(*tasks, return_exceptions=True)
+    # Outer deadline: a stalled Yahoo endpoint can't hold _heavy_sem indefinitely.
+    # Workers append as they go, so on timeout the names resolved so far are kept.
+    complete = True
+    try:
+        async with asyncio.timeout(EARNINGS_SCAN_TIMEOUT):
+            await asyncio.gather(*(worker() for _ in range(min(max_concurrency, len(tickers)))))
+    except TimeoutError:
+        logger.warning("Earnings scan hit %ss deadline; returning %d partial results (%d unscanned).",
+                       EARNINGS_SCAN_TIMEOUT, len(results), queue.qsize())
+        complete = False
     results.sort(key=lambda x: x[1])
-    return results
+    return results, complete
 
 # ------------------------------------------------------------
 # Discord events & commands
 # ------------------------------------------------------------
-@bot.event
-async def on_ready():
-    logger.info("Logged in as %s (%s)", bot.user, bot.user.id)
+def _warmup():
+    """
+    Pay first-use costs (yfinance lazy state, HTTPS keep-alive, indicator kernel
+    compile) before the first /scan_ticker instead of inside its 3s window.
+    """
+    try:
+        from utils.yf_cache import download_history
+        df = download_history("SPY", period="6mo", interval="1d")
+        if not df.empty:
+            _daily_features("SPY", df)
+    except Exception:
+        logger.warning("Warmup fetch failed; first command will pay cold-start cost.")
 
-    # Load/refresh the universe
-    await universe.initialize()
-    bot.loop.create_task(universe.refresh_weekly_forever())
+@tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    """One failure path for every slash command instead of a try/except per handler."""
+    await _report_failure(interaction, getattr(error, "original", error))
+
+@tasks.loop(hours=7 * 24)
+async def _weekly_universe_refresh():
+    # First iteration fires immediately on start(); initialize() just loaded the list.
+    if _weekly_universe_refresh.current_loop == 0:
+        return
+    await universe.refresh()
 
-    # Fast, deterministic slash-command sync to a single guild if provided
+def _commands_hash() -> str:
+    """
+    Digest of the command schema this process would upload plus its target
+    (application and guild), so a different bot token sharing CACHE_DIR still syncs.
+    application_id is set at login, before setup_hook runs.
+    """
+    payload = [c.to_dict() for c in tree.get_commands(guild=_GUILD_OBJ)]
+    raw = orjson.dumps({"app": bot.application_id, "guild": GUILD_ID or None, "commands": payload},
+                       option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(raw).hexdigest()
+
+def _read_stamp() -> Optional[str]:
     try:
-        if GUILD_ID:
-            guild = discord.Object(id=int(GUILD_ID))
-            await tree.sync(guild=guild)
-            logger.info("Slash commands synced to guild %s", GUILD_ID)
+        with open(COMMANDS_STAMP) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _write_stamp(digest: str) -> None:
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        with open(COMMANDS_STAMP, "w") as f:
+            f.write(digest)
+    except OSError:
+        logger.warning("Could not write command stamp %s", COMMANDS_STAMP)
+
+async def _sync_commands() -> List[app_commands.AppCommand]:
+    """One REST sync: the configured guild when set, else global."""
+    async with _SYNC_LOCK:
+        synced = await (tree.sync(guild=_GUILD_OBJ) if _GUILD_OBJ else tree.sync())
+        _write_stamp(_commands_hash())
+        return synced
+
+HEARTBEAT_SECONDS = 60
+
+def _heartbeat():
+    # Timer-handle chain rather than a `while True: sleep` task: nothing stays
+    # parked on the loop between ticks.
+    logger.debug("heartbeat: latency %.0f ms, %d background tasks", bot.latency * 1000, len(_background_tasks))
+    asyncio.get_running_loop().call_later(HEARTBEAT_SECONDS, _heartbeat)
+
+async def _startup():
+    # Every blocking call goes through to_thread; give it one fixed-size pool
+    # instead of the CPU-count default so a scan fan-out can't grow threads unbounded.
+    asyncio.get_running_loop().set_default_executor(_blocking_pool)
+    # Warm in the background: the pandas/yfinance import and SPY fetch overlap the
+    # gateway connect instead of delaying it. A /scan_ticker arriving first just
+    # pays the import itself (the import lock makes the two share it).
+    _spawn(asyncio.to_thread(_warmup))
+
+    # Load the universe, then hand refreshes to the self-rescheduling weekly loop.
+    await universe.initialize()
+    _weekly_universe_refresh.start()
+    # The tick only logs at DEBUG; don't schedule it at all when that is filtered out.
+    if KEEP_ALIVE and logger.isEnabledFor(logging.DEBUG):
+        asyncio.get_running_loop().call_later(HEARTBEAT_SECONDS, _heartbeat)
+
+    # Fast, deterministic slash-command sync to a single guild if provided.
+    # Commands persist server-side, so reconnects don't need it; use /sync after changes.
+    if _GUILD_OBJ:
+        # Commands are declared global; mirror them into the guild once so the
+        # single guild sync below registers them (instantly, unlike a global sync).
+        tree.copy_global_to(guild=_GUILD_OBJ)
+    # The sync is a rate-limited bulk PUT; skip it when the schema matches what
+    # the last successful sync uploaded. FORCE_COMMAND_SYNC=1 or /sync override.
+    if not FORCE_COMMAND_SYNC and _read_stamp() == _commands_hash():
+        logger.info("Slash commands unchanged since last sync; skipping.")
+        return
+    try:
+        synced = await _sync_commands()
+        if _GUILD_OBJ:
+            logger.info("Synced %d slash commands to guild %s", len(synced), GUILD_ID)
         else:
-            await tree.sync()
-            logger.info("Slash commands synced globally (can take ~1h the first time).")
+            logger.info("Synced %d slash commands globally (can take ~1h the first time).", len(synced))
     except Exception:
         logger.exception("Slash command sync failed")
 
-    logger.info("Bot ready.")
+@bot.event
+async def on_ready():
+    logger.info("Logged in as %s (%s); bot ready.", bot.user, bot.user.id)
 
 # Simple health check
 @tree.command(name="ping", description="Latency/health check")
 async def ping(interaction: discord.Interaction):
+    # Nothing to wait on: answer directly instead of defer + followup (one round trip).
     await interaction.response.send_message(f"Pong! Latency: {bot.latency*1000:.0f} ms")
 
+# Static command reference: built once at import, sent as-is on every /help
+_HELP_EMBED = discord.Embed(
+    title="Premarket Scanner • Help",
+    description=(
+        "`/scan_ticker <ticker>` — daily trend/momentum card (EMA20/50, RSI, MACD, volume)\n"
+        "`/earnings_watch [days] [limit]` — upcoming earnings across the universe\n"
+        "`/ping` — latency check\n"
+        "`/sync` — resync slash commands (admins)"
+    ),
+    color=_COLOR_NEUTRAL,
+)
+
+@tree.command(name="help", description="List the scanner's commands")
+async def help_cmd(interaction: discord.Interaction):
+    await interaction.response.send_message(embed=_HELP_EMBED, ephemeral=True)
+
 # Manual resync if you change commands
 @tree.command(name="sync", description="Admin-only: force resync of slash commands")
+@deferred(ephemeral=True)
 async def sync(interaction: discord.Interaction):
-    # Gate: only server owner or user with manage_guild (adjust if needed)
-    if not (interaction.user == interaction.guild.owner or interaction.user.guild_permissions.manage_guild):
-        await interaction.response.send_message("Not allowed.", ephemeral=True)
+    # Gate: ADMIN_USER_IDS, server owner, or manage_guild. owner_id is always on the
+    # guild payload; guild.owner needs the members cache and is None without that intent.
+    user, guild = interaction.user, interaction.guild
+    allowed = (user.id in ADMIN_USER_IDS
+               or (guild is not None and (user.id == guild.owner_id
+                                          or user.guild_permissions.manage_guild)))
+    if not allowed:
+        await _safe_followup(interaction, "Not allowed.", ephemeral=True)
         return
-    await interaction.response.defer(ephemeral=True)
-    try:
-        if GUILD_ID:
-            await tree.sync(guild=discord.Object(id=int(GUILD_ID)))
-        else:
-            await tree.sync()
-        await interaction.followup.send("Synced.")
-    except Exception as e:
-        await interaction.followup.send(f"Sync failed: {e}")
+    await _sync_commands()
+    await _safe_followup(interaction, "Synced.", ephemeral=True)
 
 # Ticker scan with indicators
 @tree.command(name="scan_ticker", description="Analyze a single ticker (daily).")
-@app_commands.describe(ticker="Symbol, e.g., NVDA")
-async def scan_ticker(interaction: discord.Interaction, ticker: str):
-    await interaction.response.defer(thinking=True)
-    ticker = ticker.strip().upper()
-    embed, err = analyze_ticker_daily(ticker)
+@app_commands.describe(ticker="Symbol, e.g., NVDA", force="Bypass the short result cache and refetch")
+@deferred()
+async def scan_ticker(interaction: discord.Interaction, ticker: str, force: bool = False):
+    _spawn(_scan_ticker_job(interaction, ticker.strip().upper(), force), interaction)
+
+# Yahoo symbol shape: equities (BRK-B), indices (^GSPC), FX/futures (EURUSD=X, ES=F)
+_TICKER_RE = re.compile(r"[A-Z0-9^][A-Z0-9.\-=]{0,11}")
+
+async def _scan_ticker_job(interaction: discord.Interaction, ticker: str, force: bool = False):
+    if not _TICKER_RE.fullmatch(ticker):
+        await _safe_followup(interaction, "Please pass a ticker symbol, e.g. NVDA.")
+        return
+    async with _scan_sem:
+        # Only successful cards are cached; a download error is shown once, then retried.
+        embed, err = await cached_call(f"analyze:{ticker}", ANALYZE_TTL,
+                                       functools.partial(_run_analyze, ticker, force), force=force,
+                                       keep=lambda v: v[1] is None)
     if err:
         await _safe_followup(interaction, f"{err}")
         return
@@ -253,36 +626,66 @@ async def scan_ticker(interaction: discord.Interaction, ticker: str):
 # Broad upcoming earnings scan across the maintained universe
 @tree.command(name="earnings_watch", description="Upcoming earnings across the broad universe.")
 @app_commands.describe(days="Look-ahead window in days (default 30)", limit="How many symbols to check this run (default 300)")
-async def earnings_watch(interaction: discord.Interaction, days: int = 30, limit: int = 300):
-    await interaction.response.defer(thinking=True)
-    days = max(1, min(120, days))
-    limit = max(25, min(3000, limit))  # safety guard
-    symbols = universe.get(limit=None)  # full list
-    if not symbols:
+@deferred()
+async def earnings_watch(interaction: discord.Interaction,
+                         days: app_commands.Range[int, 1, 120] = 30,
+                         limit: app_commands.Range[int, 25, 3000] = 300):
+    # Bounds are enforced by Discord's client before the interaction is sent.
+    _spawn(_earnings_watch_job(interaction, days, limit), interaction)
+
+async def _earnings_watch_job(interaction: discord.Interaction, days: int, limit: int):
+    # Clip this run to 'limit' to control request count (slice of the startup snapshot)
+    target = universe.get(limit=limit)
+    if not target:
         await _safe_followup(interaction, "Universe is empty.")
         return
 
-    # Clip this run to 'limit' to control request count
-    target = symbols[:limit]
-    results = await _earnings_scan(target, days=days, max_concurrency=12)
-
-    if not results:
-        await _safe_followup(interaction, f"No earnings within {days} days in the first {limit} tickers.")
+    # Rendered pages are cached per (days, limit, exact symbol slice): a repeat run within
+    # the TTL skips the per-symbol lookups and embed building and just re-sends. Older
+    # pages (up to EARNINGS_PAGES_STALE) are sent at once and rescanned in the background.
+    # Pages from a scan cut short by the deadline are sent (marked partial) but not cached.
+    digest = hashlib.blake2b("\n".join(target).encode(), digest_size=8).hexdigest()
+    embeds, complete = await cached_call(f"earnings_pages:{days}:{limit}:{digest}", EARNINGS_PAGES_TTL,
+                                          functools.partial(_earnings_pages, target, days, limit),
+                                          stale_ttl=EARNINGS_PAGES_STALE, keep=lambda v: v[1])
+
+    if not embeds:
+        scope = f"the first {limit} tickers" if complete else "the tickers scanned before the deadline"
+        await _safe_followup(interaction, f"No earnings within {days} days in {scope}.")
         return
-
-    # Build a clean text block (paginate if long)
-    lines = [f"**Upcoming earnings (≤ {days} days, first {limit} names):**"]
-    for sym, dt in results[:200]:  # keep Discord message size in check
-        ts = dt.astimezone(timezone.utc).strftime("%Y-%m-%d")
-        lines.append(f"- `{sym}` → {ts}")
-    text = "\n".join(lines)
-    await _safe_followup(interaction, text)
+    await _send_embeds(interaction, embeds)
+
+async def _earnings_pages(target: Sequence[str], days: int, limit: int) -> Tuple[List[discord.Embed], bool]:
+    # The gate is taken here, not by the caller, so background revalidations count too.
+    async with _heavy_sem:
+        results, complete = await _earnings_scan(target, days=days)
+    # Build a clean list, paginated into embeds (a single text message caps at 2000 chars)
+    # Dates come back UTC-aware from utils.yf_cache, so format them directly.
+    rows = results[:200]  # keep Discord message size in check
+    n_pages = -(-len(rows) // EARNINGS_PAGE_SIZE)
+    title = f"Upcoming earnings (≤ {days} days, first {limit} names)"
+    note = "" if complete else " • partial: scan timed out"
+    # One pass: each page's lines are formatted straight into its embed.
+    return [
+        discord.Embed(title=title, color=_COLOR_EARNINGS,
+                      description="\n".join(f"- `{sym}` → {dt:%Y-%m-%d}" for sym, dt in rows[i:i + EARNINGS_PAGE_SIZE]))
+        .set_footer(text=f"Page {i // EARNINGS_PAGE_SIZE + 1}/{n_pages}{note}")
+        for i in range(0, len(rows), EARNINGS_PAGE_SIZE)
+    ], complete
 
 # ------------------------------------------------------------
 # Main
 # ------------------------------------------------------------
 def main():
     logger.info("Starting bot…")
+    try:
+        # libuv-backed loop: cheaper callbacks/timers; discord.py runs on it unchanged
+        import uvloop
+        # uvloop.install() is deprecated on 3.12+; set the policy bot.run's asyncio.run uses
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop.")
+    except ImportError:
+        pass
     bot.run(TOKEN, log_handler=None)
 
 if __name__ == "__main__":
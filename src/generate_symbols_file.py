@@ -18,8 +18,17 @@ ADR_PAT = re.compile(r"ADR|AMERICAN DEPOSITARY", re.I)
 FUND_PAT = re.compile(r"FUND|ETF|ETN|TRUST|CLOSED-END", re.I)
 NONCOMMON_PAT = re.compile(r"SPAC|ACQUISITION CORP", re.I)
 
+_session = None
+
+def _http() -> requests.Session:
+    # Both lists live on the same host: one keep-alive connection, one TLS handshake.
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
 def _fetch(url: str) -> str:
-    r = requests.get(url, timeout=30)
+    r = _http().get(url, timeout=30)
     r.raise_for_status()
     return r.text
 
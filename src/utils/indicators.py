@@ -0,0 +1,53 @@
+import numpy as np
+
+# NumPy ports of the `ta` indicators used by the bot. Semantics match ta's
+# pandas implementation (ewm with adjust=False, min_periods=window): values
+# before the first full window are NaN. numba is optional: without it the
+# kernels run as plain Python/NumPy.
+
+def _ewm_py(x: np.ndarray, alpha: float) -> np.ndarray:
+    out = np.empty_like(x)
+    if len(x) == 0:
+        return out
+    acc = x[0]
+    out[0] = acc
+    for i in range(1, len(x)):
+        acc = alpha * x[i] + (1.0 - alpha) * acc
+        out[i] = acc
+    return out
+
+_ewm_impl = None
+
+def _ewm(x: np.ndarray, alpha: float) -> np.ndarray:
+    # The recursion is the per-ticker hot loop. JIT it with numba when installed;
+    # the import and compile happen on first use so bot startup isn't blocked.
+    global _ewm_impl
+    if _ewm_impl is None:
+        try:
+            from numba import njit
+            _ewm_impl = njit(cache=True)(_ewm_py)
+        except ImportError:
+            _ewm_impl = _ewm_py
+    return _ewm_impl(x, float(alpha))
+
+def ema(x: np.ndarray, window: int) -> np.ndarray:
+    out = _ewm(x, 2.0 / (window + 1))
+    out[: window - 1] = np.nan
+    return out
+
+def rsi(x: np.ndarray, window: int = 14) -> np.ndarray:
+    delta = np.diff(x, prepend=x[:1])
+    avg_up = _ewm(np.where(delta > 0, delta, 0.0), 1.0 / window)
+    avg_dn = _ewm(np.where(delta < 0, -delta, 0.0), 1.0 / window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(avg_dn == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_up / avg_dn))
+    out[: window - 1] = np.nan
+    return out
+
+def macd_diff(x: np.ndarray, window_fast: int = 12, window_slow: int = 26, window_sign: int = 9) -> np.ndarray:
+    line = ema(x, window_fast) - ema(x, window_slow)
+    out = np.full_like(line, np.nan)
+    start = window_slow - 1
+    if len(x) > start:
+        out[start:] = line[start:] - ema(line[start:], window_sign)
+    return out
@@ -1,7 +1,13 @@
 import os
+import sys
 import asyncio
+import functools
 import logging
-from typing import List, Iterable, Optional
+import re
+from array import array
+from pathlib import Path
+from collections.abc import Sequence
+from typing import Callable, List, Iterable, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -9,18 +15,73 @@ SYMBOLS_FILE_ENV = "SYMBOLS_FILE"
 ALL_TICKERS_ENV = "ALL_TICKERS"
 SCAN_UNIVERSE_ENV = "SCAN_UNIVERSE"  # optional small default
 
-DEFAULT_UNIVERSE_FALLBACK = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "AMD", "JPM"]
+DEFAULT_UNIVERSE_FALLBACK: Tuple[str, ...] = ("AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "AMD", "JPM")
+
+# Separator runs (commas and/or any whitespace, newlines included) in one pass,
+# so tokens come out already stripped.
+_SPLIT_RE = re.compile(r"[,\s]+")
+# Symbol-file hygiene: skip share classes/units/indices written with these characters
+_BAD_SYMBOL_RE = re.compile(r"[ /^.]")
 
 def _parse_csv_symbols(text: str) -> List[str]:
     # Accept comma or whitespace separated, normalize and dedupe
-    raw = [s.strip().upper() for s in text.replace("\n", ",").split(",") if s.strip()]
-    out = []
-    seen = set()
-    for s in raw:
-        if s not in seen:
-            seen.add(s)
-            out.append(s)
-    return out
+    # dict.fromkeys: order-preserving dedupe in C instead of a seen-set loop
+    return list(dict.fromkeys(sys.intern(s.upper()) for s in _SPLIT_RE.split(text) if s))
+
+@functools.lru_cache(maxsize=4)
+def _parse_env_universe(text: str) -> Tuple[str, ...]:
+    # Env values are fixed for the process lifetime; parse each distinct value once.
+    return tuple(sorted(set(_parse_csv_symbols(text))))
+
+@functools.lru_cache(maxsize=1)
+def _generator() -> Optional[Callable[..., List[str]]]:
+    """Resolve generate_symbols_file.main once per process (None if unavailable)."""
+    try:
+        from src.generate_symbols_file import main as gen_main  # local import to avoid import cycles
+    except Exception:
+        try:
+            from ..generate_symbols_file import main as gen_main  # alt path if run as module
+        except Exception:
+            logger.exception("Could not import symbols generator.")
+            return None
+    return gen_main
+
+class PackedSymbols(Sequence):
+    """
+    Read-only symbol list stored as one newline-terminated bytes blob plus an
+    int offsets table. A few thousand 1-5 char tickers as separate str objects
+    cost ~50 bytes of header each; here they cost their payload + 5 bytes.
+    """
+    __slots__ = ("_blob", "_offsets")
+
+    def __init__(self, symbols: Iterable[str] = ()):
+        encoded = [s.encode("utf-8") for s in symbols]
+        self._blob = b"".join(e + b"\n" for e in encoded)
+        offsets = array("i", [0])
+        pos = 0
+        for e in encoded:
+            pos += len(e) + 1
+            offsets.append(pos)
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        n = len(self)
+        if isinstance(i, slice):
+            start, stop, step = i.indices(n)
+            if step != 1:
+                return tuple(self[j] for j in range(start, stop, step))
+            if start >= stop:
+                return ()
+            # contiguous run: one decode + split instead of per-item slicing
+            return tuple(self._blob[self._offsets[start]:self._offsets[stop] - 1].decode("utf-8").split("\n"))
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("symbol index out of range")
+        return self._blob[self._offsets[i]:self._offsets[i + 1] - 1].decode("utf-8")
 
 class UniverseManager:
     """
@@ -31,19 +92,29 @@ class UniverseManager:
       4) DEFAULT_UNIVERSE_FALLBACK
     """
     def __init__(self):
-        self.symbols: List[str] = []
+        # Immutable packed snapshot, swapped wholesale on (re)load so readers never lock.
+        self.symbols: PackedSymbols = PackedSymbols()
         self.symbols_file = os.getenv(SYMBOLS_FILE_ENV, "data/symbols_robinhood.txt")
+        # (mtime, rows) of the last parse; the file is only re-read when it changes
+        self._file_cache: Optional[Tuple[float, List[str]]] = None
 
     def _load_from_file(self) -> Optional[List[str]]:
         path = self.symbols_file
-        if not path or not os.path.exists(path):
+        if not path:
+            return None
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
             return None
+        if self._file_cache and self._file_cache[0] == mtime:
+            return self._file_cache[1]
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                rows = [ln.strip().upper() for ln in f if ln.strip() and not ln.startswith("#")]
+            lines = Path(path).read_text(encoding="utf-8").splitlines()
+            rows = [s for s in (ln.strip().upper() for ln in lines) if s and not s.startswith("#")]
             # basic symbol hygiene
-            rows = [s for s in rows if s.isascii() and all(c not in s for c in (" ", "/", "^", "."))]
-            rows = sorted(set(rows))
+            rows = [s for s in rows if s.isascii() and not _BAD_SYMBOL_RE.search(s)]
+            rows = [sys.intern(s) for s in sorted(set(rows))]
+            self._file_cache = (mtime, rows)
             return rows
         except Exception:
             logger.exception("Failed reading symbols file %s", path)
@@ -52,65 +123,47 @@ class UniverseManager:
     def _load_from_env(self) -> Optional[List[str]]:
         all_tickers = os.getenv(ALL_TICKERS_ENV, "").strip()
         if all_tickers:
-            return sorted(set(_parse_csv_symbols(all_tickers)))
+            return list(_parse_env_universe(all_tickers))
         scan_universe = os.getenv(SCAN_UNIVERSE_ENV, "").strip()
         if scan_universe:
-            return sorted(set(_parse_csv_symbols(scan_universe)))
+            return list(_parse_env_universe(scan_universe))
         return None
 
     async def initialize(self) -> None:
-        # 1) Try file; if missing, generate it.
-        rows = self._load_from_file()
+        # 1) Try file; if missing, generate it. (stat + read + parse: off the loop too)
+        rows = await asyncio.to_thread(self._load_from_file)
         if rows is None:
-            try:
-                # create file once
-                from src.generate_symbols_file import main as gen_main  # local import to avoid import cycles
-            except Exception:
-                try:
-                    from ..generate_symbols_file import main as gen_main  # alt path if run as module
-                except Exception:
-                    logger.exception("Could not import generator; falling back to env universe.")
-                    rows = None
-                else:
-                    rows = gen_main(write_file=True)
+            gen_main = _generator()
+            if gen_main is None:
+                logger.warning("No symbols generator; falling back to env universe.")
             else:
-                rows = gen_main(write_file=True)
+                # network fetch + file write: keep it off the event loop
+                rows = await asyncio.to_thread(gen_main, write_file=True)  # create file once
 
         # 2) If still no file-based rows, fall back to env.
         if not rows:
             env_rows = self._load_from_env()
             rows = env_rows if env_rows else DEFAULT_UNIVERSE_FALLBACK
 
-        self.symbols = rows
+        self.symbols = PackedSymbols(rows)
         logger.info("Universe loaded: %s tickers", len(self.symbols))
 
-    def get(self, limit: Optional[int] = None) -> List[str]:
+    def get(self, limit: Optional[int] = None) -> Tuple[str, ...]:
         if not self.symbols:
             return DEFAULT_UNIVERSE_FALLBACK[: limit or None]
         return self.symbols[: limit or None]
 
-    async def refresh_weekly_forever(self) -> None:
-        """
-        Background task: refresh symbols once a week (NASDAQ lists update daily;
-        weekly is a good cadence without being noisy).
-        """
-        while True:
-            try:
-                from src.generate_symbols_file import main as gen_main
-            except Exception:
-                try:
-                    from ..generate_symbols_file import main as gen_main
-                except Exception:
-                    logger.exception("Weekly refresh: failed to import generator.")
-                    await asyncio.sleep(7 * 24 * 3600)
-                    continue
-
-            try:
-                rows = gen_main(write_file=True)
-                if rows:
-                    self.symbols = rows
-                    logger.info("Weekly symbols refresh complete: %s tickers", len(rows))
-            except Exception:
-                logger.exception("Weekly symbols refresh failed.")
-
-            await asyncio.sleep(7 * 24 * 3600)
+    async def refresh(self) -> None:
+        """One symbols refresh cycle: regenerate the file and swap in the new snapshot."""
+        gen_main = _generator()
+        if gen_main is None:
+            logger.error("Weekly refresh: no symbols generator available.")
+            return
+
+        try:
+            rows = await asyncio.to_thread(gen_main, write_file=True)
+            if rows:
+                self.symbols = PackedSymbols(rows)
+                logger.info("Weekly symbols refresh complete: %s tickers", len(rows))
+        except Exception:
+            logger.exception("Weekly symbols refresh failed.")
@@ -0,0 +1,229 @@
+import os
+import time
+import threading
+import logging
+import re
+import datetime as dt
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+import orjson
+import pandas as pd
+import requests
+import yfinance as yf
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "CACHE_DIR"
+# Default is private to the user (~/.cache, created 0o700), not a shared /tmp path
+# other accounts on the host could write into.
+CACHE_DIR = os.getenv(CACHE_DIR_ENV) or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "premarket_scanner")
+PRICES_DIR = os.path.join(CACHE_DIR, "prices")
+EARNINGS_DIR = os.path.join(CACHE_DIR, "earnings")
+
+INTRADAY_TTL = 3600       # intraday bars, and daily bars while today's session is live or pending
+EOD_TTL = 24 * 3600       # completed daily bars / earnings dates change at most once a day
+EOD_INTERVALS = {"1d", "5d", "1wk", "1mo", "3mo"}
+NY = ZoneInfo("America/New_York")
+
+# L1: in-process dict in front of the on-disk L2, key -> (expires_at, value). Keys
+# carry the UTC date, so the whole dict is dropped on date rollover instead of
+# scanning entries for expiry.
+_MEM: Dict[tuple, Tuple[float, object]] = {}
+_MEM_STAMP = ""
+
+# One pooled HTTPS session shared by every yf.Ticker, so a fan-out over a few
+# hundred symbols reuses connections instead of paying a TLS handshake each.
+POOL_SIZE = 32
+_session = None
+_session_ok = True
+
+def _shared_session() -> requests.Session:
+    global _session
+    if _session is None:
+        s = requests.Session()
+        s.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE,
+                                        max_retries=Retry(total=2, backoff_factor=0.3)))
+        _session = s
+    return _session
+
+def ticker(symbol: str) -> yf.Ticker:
+    """yf.Ticker on the shared session; falls back to yfinance's own if it refuses ours."""
+    global _session_ok
+    if _session_ok:
+        try:
+            return yf.Ticker(symbol, session=_shared_session())
+        except Exception:
+            # Newer yfinance releases only accept their own (curl_cffi) session type.
+            _session_ok = False
+            logger.info("yfinance rejected the shared session; using its default")
+    return yf.Ticker(symbol)
+
+def _utc_stamp() -> str:
+    return dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d")
+
+def _prices_expire_at(interval: str, fetched: float) -> float:
+    """
+    Expiry for a price frame fetched at `fetched`. A daily frame fetched before
+    today's close still has a live (or not yet printed) session bar, so it only
+    gets the intraday TTL; once the session is over its bars are final until
+    the next weekday open.
+    """
+    if interval not in EOD_INTERVALS:
+        return fetched + INTRADAY_TTL
+    ny = dt.datetime.fromtimestamp(fetched, NY)
+    if ny.weekday() < 5 and ny.hour < 16:
+        return fetched + INTRADAY_TTL
+    nxt = (ny + dt.timedelta(days=1)).replace(hour=9, minute=30, second=0, microsecond=0)
+    while nxt.weekday() >= 5:
+        nxt += dt.timedelta(days=1)
+    return min(fetched + EOD_TTL, nxt.timestamp())
+
+def _mem_get(key: tuple):
+    global _MEM_STAMP
+    if key[-1] != _MEM_STAMP:
+        _MEM.clear()
+        _MEM_STAMP = key[-1]
+        return None
+    hit = _MEM.get(key)
+    if hit is None or time.time() >= hit[0]:
+        return None
+    return hit[1]
+
+def _mem_put(key: tuple, value, expires_at: float) -> None:
+    _MEM[key] = (expires_at, value)
+
+def _disk_fresh(path: str, ttl: int) -> bool:
+    try:
+        return time.time() - os.path.getmtime(path) < ttl
+    except OSError:
+        return False
+
+def _atomic_write(path: str, writer) -> None:
+    os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    # per-thread temp name: concurrent misses for the same key must not share it
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    writer(tmp)
+    os.replace(tmp, path)
+
+_TZ_SUFFIX = re.compile(r"(?:[+-]\d\d:?\d\d|Z)$")
+
+def _read_frame(path: str) -> pd.DataFrame:
+    # Price frames are stored as CSV, not pickle: a cache file is data, never code.
+    df = pd.read_csv(path, index_col=0)
+    idx = pd.to_datetime(df.index, utc=True)  # utc=True also copes with mixed DST offsets
+    if len(df.index) and not _TZ_SUFFIX.search(str(df.index[0])):
+        idx = idx.tz_localize(None)  # daily bars are written tz-naive; keep them that way
+    df.index = idx
+    return df
+
+def download_history(symbol: str, period: str = "6mo", interval: str = "1d", force: bool = False) -> pd.DataFrame:
+    """
+    yf.download for a single symbol, cached per (symbol, period, interval, UTC date).
+    force skips both cache tiers and refetches (the fresh frame is still cached).
+    Returned frames are shared between callers; do not mutate them in place.
+    """
+    symbol = symbol.upper()
+    key = ("prices", symbol, period, interval, _utc_stamp())
+    hit = None if force else _mem_get(key)
+    if hit is not None:
+        return hit
+
+    path = os.path.join(PRICES_DIR, f"{symbol}_{period}_{interval}_{key[-1]}.csv")
+    try:
+        expires = 0.0 if force else _prices_expire_at(interval, os.path.getmtime(path))
+    except OSError:
+        expires = 0.0
+    if time.time() < expires:
+        try:
+            df = _read_frame(path)
+            _mem_put(key, df, expires)
+            return df
+        except Exception:
+            logger.warning("Unreadable price cache %s; refetching", path)
+
+    df = yf.download(symbol, period=period, interval=interval, progress=False, auto_adjust=False)
+    if df is None or df.empty:
+        return pd.DataFrame()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [lvl0 for (lvl0, _) in df.columns]
+    try:
+        _atomic_write(path, df.to_csv)
+    except Exception:
+        logger.exception("Failed writing price cache %s", path)
+    now = time.time()
+    _mem_put(key, df, _prices_expire_at(interval, now))
+    return df
+
+def _fetch_earnings_dates(symbol: str) -> Tuple[List[dt.datetime], bool]:
+    """Returns (UTC-aware event datetimes, complete) where complete is False if a lookup errored."""
+    t = ticker(symbol)
+    out: List[dt.datetime] = []
+    complete = True
+
+    # 1) get_earnings_dates: DatetimeIndex of event dates
+    try:
+        df = t.get_earnings_dates(limit=8)
+        if df is not None and not df.empty:
+            for ts in df.index:
+                ts = ts if ts.tzinfo else ts.tz_localize("UTC")
+                out.append(ts.to_pydatetime().astimezone(dt.timezone.utc))
+    except Exception:
+        complete = False
+
+    # 2) Fallback: calendar attribute (older yfinance style)
+    if not out:
+        try:
+            cal = t.calendar
+            if isinstance(cal, pd.DataFrame) and "Earnings Date" in cal.index:
+                raw = cal.loc["Earnings Date"].values
+                if raw is not None and len(raw) >= 1:
+                    ed = raw[0]
+                    if isinstance(ed, (pd.Timestamp, dt.datetime)):
+                        dtu = ed.to_pydatetime() if isinstance(ed, pd.Timestamp) else ed
+                        if dtu.tzinfo is None:
+                            dtu = dtu.replace(tzinfo=dt.timezone.utc)
+                        out.append(dtu)
+        except Exception:
+            complete = False
+
+    return sorted(out), complete
+
+def earnings_dates(symbol: str) -> Tuple[List[dt.datetime], bool]:
+    """
+    (known earnings event datetimes (UTC), complete), cached per (symbol, UTC date).
+    complete is False when a Yahoo lookup errored; such answers are never cached
+    here and callers shouldn't cache them either.
+    """
+    symbol = symbol.upper()
+    key = ("earnings", symbol, _utc_stamp())
+    hit = _mem_get(key)
+    if hit is not None:
+        return hit, True
+
+    path = os.path.join(EARNINGS_DIR, f"{symbol}_{key[-1]}.json")
+    if _disk_fresh(path, EOD_TTL):
+        try:
+            with open(path, "rb") as f:
+                dates = [dt.datetime.fromisoformat(s) for s in orjson.loads(f.read())]
+            _mem_put(key, dates, os.path.getmtime(path) + EOD_TTL)
+            return dates, True
+        except Exception:
+            logger.warning("Unreadable earnings cache %s; refetching", path)
+
+    dates, complete = _fetch_earnings_dates(symbol)
+    if complete:
+        # Only persist clean lookups so a transient Yahoo error is retried next call.
+        def _write(tmp: str) -> None:
+            with open(tmp, "wb") as f:
+                f.write(orjson.dumps(dates))  # aware datetimes serialize as RFC 3339
+        try:
+            _atomic_write(path, _write)
+        except Exception:
+            logger.exception("Failed writing earnings cache %s", path)
+        _mem_put(key, dates, time.time() + EOD_TTL)
+    return dates, complete
@@ -1,7 +1,26 @@
-import os, requests
+import os, logging, orjson, requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from scanner_core import run_scan
 
+log = logging.getLogger("webhook")
 WEBHOOK = os.environ.get("DISCORD_WEBHOOK","")
+POST_TIMEOUT = 30
+
+def _http_session():
+    """
+    Keep-alive session for webhook posts. A 429 (rejected, so nothing was posted)
+    is retried honouring Discord's Retry-After, as are failed connects. 5xx and
+    read errors are not: Discord may already have posted the message, and a
+    webhook POST isn't idempotent.
+    """
+    s = requests.Session()
+    retry = Retry(total=3, connect=3, read=0, backoff_factor=0.5, status_forcelist=(429,),
+                  allowed_methods=frozenset({"POST"}), respect_retry_after_header=True)
+    s.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry))
+    # bodies are serialized with orjson (bytes out, no re-encode); header set once
+    s.headers["Content-Type"] = "application/json"
+    return s
 
 def color_for(bias):
     return 0x2ecc71 if bias=="CALL" else 0xe74c3c
@@ -10,6 +29,25 @@ def chunk_embeds(embeds, size=10):
     for i in range(0, len(embeds), size):
         yield embeds[i:i+size]
 
+# Compiled once; filled per row with str.format_map over the row dict (keys are
+# run_scan's column names, spaces included).
+_DESC_TMPL = (
+    "**Bias:** {Type}  •  **Exp:** `{Target Expiration}`\n"
+    "**Buy:** {Buy Range}  •  **Target:** {Sell Target}  •  **Stop:** {Stop Idea}\n"
+    "**Risk:** {Risk}\n"
+    "**Why:** {Why}"
+)
+
+_OPT_TMPL = (
+    "`{Option Contract}` — strike **{Strike}**, mid **${Opt Mid}**, "
+    "spread **~{Spread %}%**, vol **{Opt Vol}**, OI **{Opt OI}**"
+)
+
+def _format_option_tail(r):
+    """Newline + option line for a pick: the chosen contract, else run_scan's note ("" if neither)."""
+    line = _OPT_TMPL.format_map(r) if r["Option Contract"] else r["Opt Note"]
+    return f"\n{line}" if line else ""
+
 def build_embeds(df, title="Premarket Ranked Scan"):
     header = {
         "title": f"📣 {title}",
@@ -17,32 +55,42 @@ def build_embeds(df, title="Premarket Ranked Scan"):
         "color": 0x7289DA
     }
     embeds=[header]
-    for _, r in df.iterrows():
-        desc = (
-            f"**Bias:** {r['Type']}  •  **Exp:** `{r['Target Expiration']}`\n"
-            f"**Buy:** {r['Buy Range']}  •  **Target:** {r['Sell Target']}  •  **Stop:** {r['Stop Idea']}\n"
-            f"**Risk:** {r['Risk']}\n"
-            f"**Why:** {r['Why']}"
-        )
-        opt_line = (f"`{r['Option Contract']}` — strike **{r['Strike']}**, mid **${r['Opt Mid']}**, "
-                    f"spread **~{r['Spread %']}%**, vol **{r['Opt Vol']}**, OI **{r['Opt OI']}**") if r["Option Contract"] else r["Opt Note"]
+    # to_dict("records"): plain dicts, no per-row Series construction as with iterrows()
+    for r in df.to_dict("records"):
         embeds.append({
             "title": f"{r['Ticker']}  •  ${r['Price']}",
-            "description": desc + ("\n" + opt_line if opt_line else ""),
+            "description": _DESC_TMPL.format_map(r) + _format_option_tail(r),
             "color": color_for(r["Type"])
         })
     return embeds
 
+def _post(http, payload):
+    try:
+        resp = http.post(WEBHOOK, data=orjson.dumps(payload), timeout=POST_TIMEOUT)
+    except requests.RequestException as e:  # incl. RetryError once the 429 retries run out
+        log.error("Webhook post failed: %s", e)
+        return False
+    if not resp.ok:  # e.g. 400 bad payload, or a 5xx deliberately not retried
+        log.error("Webhook post rejected: HTTP %s %s", resp.status_code, resp.text[:500])
+        return False
+    return True
+
 def main():
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(),
+                        format="%(asctime)s [%(levelname)7s] %(name)s: %(message)s")
     if not WEBHOOK:
-        print("Missing DISCORD_WEBHOOK"); return
+        log.error("Missing DISCORD_WEBHOOK"); return
     df, meta = run_scan(top_k=10)
-    if df.empty:
-        requests.post(WEBHOOK, json={"content":"**📣 Premarket Scan**\n_No candidates today._"}); 
-        return
-    embeds = build_embeds(df)
-    for batch in chunk_embeds(embeds, size=10):
-        requests.post(WEBHOOK, json={"embeds": batch})
+    log.info("%s", meta)
+    # One keep-alive connection for every post of this run instead of a TLS handshake each
+    with _http_session() as http:
+        if df.empty:
+            ok = _post(http, {"content":"**📣 Premarket Scan**\n_No candidates today._"})
+        else:
+            embeds = build_embeds(df)
+            ok = all([_post(http, {"embeds": batch}) for batch in chunk_embeds(embeds, size=10)])
+    if not ok:
+        raise SystemExit(1)  # fail the scheduled run instead of reporting success
 
 if __name__ == "__main__":
     main()